@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 
+import asyncio
 import logging
 import sys
+from collections import defaultdict
 from tests.block_network_access import block_network_access
 from tests.aks_zone_down import aks_zone_down
 from tests.postgres_failover import postgres_failover
@@ -14,17 +16,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# One lock per AKS cluster: experiments targeting the same cluster would trample
+# each other (kubeconfig, node pools), so they serialize while unrelated
+# experiments still run concurrently.
+cluster_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
-def main():
+
+async def main():
     """
     Main function to orchestrate zone redundancy experiments.
 
+    Experiments are independent of each other, so instead of running them
+    back-to-back (total runtime = sum of all block durations plus Azure CLI
+    round-trips) we launch them together with asyncio.gather and let the
+    blocking CLI work run in threads. Total runtime is then roughly the
+    duration of the slowest experiment.
     """
-    logger.info("\n\nStarting chaos experiments")    
+    logger.info("\n\nStarting chaos experiments")
 
     # Global Configuration
     resource_group = "test"
 
+    experiments = {}
+
 
     #
     #
@@ -36,14 +50,16 @@ def main():
         label_selector = "app=hello-world"
         graceful_stop = False
 
-        logger.info("Experiment 1: Kill pods in AKS cluster.")
-        success = aks_kill_pods(resource_group, cluster_name, namespace_name, label_selector, graceful_stop)
+        async def run_kill_pods(cluster_name=cluster_name, namespace_name=namespace_name,
+                                label_selector=label_selector, graceful_stop=graceful_stop):
+            async with cluster_locks[cluster_name]:
+                logger.info("Experiment 1: Kill pods in AKS cluster.")
+                return await asyncio.to_thread(
+                    aks_kill_pods, resource_group, cluster_name, namespace_name, label_selector, graceful_stop
+                )
+
+        experiments["AKS pod kill"] = run_kill_pods()
 
-        if success:
-            logger.info("AKS pod kill experiment completed successfully\n\n")
-        else:
-            logger.error("AKS pod kill experiment failed")
-    
 
     #
     #
@@ -52,13 +68,14 @@ def main():
         # Update these config values:
         cluster_name = "niels-aks-test-1"
 
-        logger.info("Experiment 2: Simulate AKS zone down.")
-        success = aks_zone_down(resource_group, cluster_name, target_zone="1")
+        async def run_zone_down(cluster_name=cluster_name):
+            async with cluster_locks[cluster_name]:
+                logger.info("Experiment 2: Simulate AKS zone down.")
+                return await asyncio.to_thread(
+                    aks_zone_down, resource_group, cluster_name, "1"
+                )
 
-        if success:
-            logger.info("AKS zone down simulation completed successfully\n\n")
-        else:
-            logger.error("AKS zone down simulation failed")
+        experiments["AKS zone down simulation"] = run_zone_down()
 
 
     #
@@ -71,13 +88,12 @@ def main():
         subnet_dest = "SubnetB"
         block_duration = 30  # seconds
 
-        logger.info("Experiment 3: Block network access between subnets.")
-        success = block_network_access(resource_group, vnet, subnet_source, subnet_dest, block_duration)
-        
-        if success:
-            logger.info("Network blocking experiment completed successfully\n\n")
-        else:
-            logger.error("Network blocking experiment failed")    
+        async def run_block_network(vnet=vnet, subnet_source=subnet_source,
+                                    subnet_dest=subnet_dest, block_duration=block_duration):
+            logger.info("Experiment 3: Block network access between subnets.")
+            return await block_network_access(resource_group, vnet, subnet_source, subnet_dest, block_duration)
+
+        experiments["Network blocking"] = run_block_network()
 
 
     #
@@ -90,14 +106,14 @@ def main():
         isolated_zone = 1
         block_duration = 60 # seconds
 
-        # Note that this will install Chaos Mesh if not already installed
-        logger.info("Experiment 4: Simulate container network faults in AKS.")
-        success = aks_container_network_partition(resource_group, cluster_name, namespace_name, isolated_zone, block_duration)
+        async def run_network_partition(cluster_name=cluster_name, namespace_name=namespace_name,
+                                        isolated_zone=isolated_zone, block_duration=block_duration):
+            async with cluster_locks[cluster_name]:
+                # Note that this will install Chaos Mesh if not already installed
+                logger.info("Experiment 4: Simulate container network faults in AKS.")
+                return await aks_container_network_partition(resource_group, cluster_name, namespace_name, isolated_zone, block_duration)
 
-        if success:
-            logger.info("AKS container network faults experiment completed successfully\n\n")
-        else:
-            logger.error("AKS container network faults experiment failed")
+        experiments["AKS container network faults"] = run_network_partition()
 
 
     #
@@ -107,15 +123,27 @@ def main():
         # Update these config values:
         database_name = "niels-test-pgdb"
 
-        logger.info("Experiment 5: Simulate PostgreSQL failover.")
-        success = postgres_failover(resource_group, database_name, forced_failover=True)
+        async def run_postgres_failover(database_name=database_name):
+            logger.info("Experiment 5: Simulate PostgreSQL failover.")
+            return await asyncio.to_thread(
+                postgres_failover, resource_group, database_name, True
+            )
 
-        if success:
-            logger.info("PostgreSQL failover completed successfully\n\n")
-        else:
-            logger.error("PostgreSQL failover failed")
+        experiments["PostgreSQL failover"] = run_postgres_failover()
 
 
+    #
+    #
+    # Run all enabled experiments concurrently
+    results = await asyncio.gather(*experiments.values(), return_exceptions=True)
+
+    for experiment_name, result in zip(experiments, results):
+        if isinstance(result, Exception):
+            logger.error("%s experiment raised an exception: %s", experiment_name, result)
+        elif result:
+            logger.info("%s experiment completed successfully", experiment_name)
+        else:
+            logger.error("%s experiment failed", experiment_name)
 
 
     #
@@ -125,4 +153,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
+import asyncio
+import json
 import logging
-import time
-from tests.utils import run_command, helm_installed, kubectl_installed, chaos_mesh_installed, install_chaos_mesh, get_aks_credentials
+from collections import defaultdict
+from tests.utils import run_command_async, helm_installed, chaos_mesh_installed, install_chaos_mesh, ensure_cluster_ready
 
 logger = logging.getLogger(__name__)
 
-def aks_container_network_partition(resource_group: str, cluster_name: str, namespace_name: str, isolated_zone: int, duration_seconds: int) -> bool:
+# For each zone we can isolate, the zones that end up on the other side of the partition
+_TARGET_ZONES = {1: ["2", "3"], 2: ["1", "3"], 3: ["1", "2"]}
+
+async def aks_container_network_partition(resource_group: str, cluster_name: str, namespace_name: str, isolated_zone: int, duration_seconds: int) -> bool:
     """
     Test function to simulate network faults in AKS containers.
     
@@ -15,95 +20,123 @@ def aks_container_network_partition(resource_group: str, cluster_name: str, name
     """
 
     try:
-        if not get_aks_credentials(resource_group, cluster_name):
-            logger.error(f"Failed to get AKS credentials.")
+        if not await asyncio.to_thread(ensure_cluster_ready, resource_group, cluster_name):
             return False
 
-        if not kubectl_installed():
-            logger.error(f"kubectl is not installed or not configured properly.")
-            return False
-        
-        if not helm_installed():
-            logger.error(f"Helm is not installed or not configured properly.")
+        if not await asyncio.to_thread(helm_installed):
+            logger.error("Helm is not installed or not configured properly.")
             return False
         
-        if not chaos_mesh_installed():
+        if not await asyncio.to_thread(chaos_mesh_installed):
             logger.debug("Chaos Mesh not found on cluster, installing it now...")
-            install_chaos_mesh()
+            await asyncio.to_thread(install_chaos_mesh)
 
-        logger.debug(f"Finding all pods that run in zone {isolated_zone}...")
-        
-        # Get a list of pods in the namespace and their zones
-        pods_in_zones_cmd = f"kubectl get pods -n '{namespace_name}' -o jsonpath='{{range .items[*]}}{{.metadata.namespace}}{{\"\\t\"}}{{.metadata.name}}{{\"\\t\"}}{{.spec.nodeName}}{{\"\\n\"}}{{end}}' | while read ns pod node; do zone=$(kubectl get node \"$node\" -o jsonpath='{{.metadata.labels.topology\\.kubernetes\\.io/zone}}'); echo \"$pod\\t$zone\"; done"
-        pods_in_zones, return_code = run_command(pods_in_zones_cmd)
-        logger.debug(f"Pods in zones:\n{pods_in_zones}")
+        logger.debug("Finding all pods that run in zone %s...", isolated_zone)
+
+        # Get all pods in the namespace and all nodes, then join them in Python.
+        # Resolving the zone per pod with 'kubectl get node <name>' would cost one
+        # API round-trip per pod; fetching the node list once costs exactly one.
+        pods_output, return_code = await run_command_async(["kubectl", "get", "pods", "-n", namespace_name, "-o", "json"])
+        if return_code != 0:
+            logger.error("Failed to list pods in namespace '%s': %s", namespace_name, pods_output)
+            return False
 
-        # Label each pod with its zone, we'll use this later as a selector
-        for pod in pods_in_zones.strip().split("\n"):
-            pod_name, pod_zone = pod.split("\t")
+        nodes_output, return_code = await run_command_async(["kubectl", "get", "nodes", "-o", "json"])
+        if return_code != 0:
+            logger.error("Failed to list cluster nodes: %s", nodes_output)
+            return False
+
+        node_zones = {
+            node["metadata"]["name"]: node["metadata"]["labels"].get("topology.kubernetes.io/zone", "")
+            for node in json.loads(nodes_output)["items"]
+        }
+
+        # Group pods by zone, we'll label them with it later as a selector
+        zone_to_pods: dict[str, list[str]] = defaultdict(list)
+        for pod in json.loads(pods_output)["items"]:
+            pod_name = pod["metadata"]["name"]
+            pod_zone = node_zones.get(pod["spec"].get("nodeName", ""), "")
+            logger.debug("Pod %s runs in zone %s", pod_name, pod_zone)
 
             # Isolate the zone number, we don't care about region here:
             pod_zone = pod_zone.split("-")[-1]
-            
-            logger.debug(f"Labeling pod {pod_name} with zone {pod_zone}...")
-            label_cmd = f"kubectl label pod '{pod_name}' -n '{namespace_name}' topology.kubernetes.io/zone={pod_zone} --overwrite"
-            output, return_code = run_command(label_cmd)
+            zone_to_pods[pod_zone].append(pod_name)
+
+        # Label all pods in a zone with a single kubectl call (kubectl accepts
+        # multiple pod names), instead of paying one subprocess + API round-trip per pod
+        for pod_zone, pods in zone_to_pods.items():
+            logger.debug("Labeling %s pod(s) with zone %s...", len(pods), pod_zone)
+            label_cmd = [
+                "kubectl", "label", "pod", *pods,
+                "-n", namespace_name,
+                f"topology.kubernetes.io/zone={pod_zone}",
+                "--overwrite",
+            ]
+            output, return_code = await run_command_async(label_cmd)
             if return_code != 0:
-                logger.error(f"Failed to label pod {pod_name} with zone {pod_zone}: {output}")
+                logger.error("Failed to label pods in zone %s: %s", pod_zone, output)
                 return False
 
-        # Define the chaos mesh network partition experiment YAML
-        target_zones = ["1", "2", "3"]
-        target_zones.remove(str(isolated_zone))
-
-        network_partition_yaml = f"""
-            apiVersion: chaos-mesh.org/v1alpha1
-            kind: NetworkChaos
-            metadata:
-                name: chaos-partition
-            spec:
-                action: partition
-                mode: all
-                selector:
-                    namespaces:
-                      - {namespace_name}
-                    labelSelectors:
-                      'topology.kubernetes.io/zone': '{isolated_zone}'
-                direction: both
-                target:
-                    mode: all
-                    selector:
-                        namespaces:
-                          - {namespace_name}
-                        expressionSelectors:
-                          - key: topology.kubernetes.io/zone
-                            operator: In
-                            values: {target_zones}
-        """        
-
-        # Start/apply the experiment
-        logger.debug(f"Applying NetworkChaos experiment")
-        apply_cmd = f"echo \"{network_partition_yaml}\" | kubectl apply -f -"
-        output, return_code = run_command(apply_cmd)
+        # Define the chaos mesh network partition experiment. Building the
+        # manifest as a dict and serializing it (kubectl accepts JSON manifests)
+        # avoids templating Python list literals into YAML by hand.
+        target_zones = _TARGET_ZONES[int(isolated_zone)]
+
+        network_partition_spec = {
+            "apiVersion": "chaos-mesh.org/v1alpha1",
+            "kind": "NetworkChaos",
+            "metadata": {
+                "name": "chaos-partition",
+            },
+            "spec": {
+                "action": "partition",
+                "mode": "all",
+                "selector": {
+                    "namespaces": [namespace_name],
+                    "labelSelectors": {
+                        "topology.kubernetes.io/zone": str(isolated_zone),
+                    },
+                },
+                "direction": "both",
+                "target": {
+                    "mode": "all",
+                    "selector": {
+                        "namespaces": [namespace_name],
+                        "expressionSelectors": [
+                            {
+                                "key": "topology.kubernetes.io/zone",
+                                "operator": "In",
+                                "values": target_zones,
+                            },
+                        ],
+                    },
+                },
+            },
+        }
+
+        # Start/apply the experiment. The manifest goes in over stdin; echoing it
+        # through the shell would re-interpret the quotes and newlines in it.
+        logger.debug("Applying NetworkChaos experiment")
+        output, return_code = await run_command_async(["kubectl", "apply", "-f", "-"], json.dumps(network_partition_spec))
         if return_code != 0:
-            logger.error(f"Failed to apply NetworkChaos experiment: {output}")
+            logger.error("Failed to apply NetworkChaos experiment: %s", output)
             return False
 
         # Wait for the specified duration.
-        logger.info(f"Network partition applied, waiting for {duration_seconds}...")
-        time.sleep(duration_seconds)
+        logger.info("Network partition applied, waiting for %s...", duration_seconds)
+        await asyncio.sleep(duration_seconds)
 
-        # Clean up the experiment
-        logger.debug(f"Deleting NetworkChaos experiment...")
-        delete_cmd = "kubectl delete networkchaos chaos-partition"
-        output, return_code = run_command(delete_cmd)
+        # Clean up the experiment by deleting the exact manifest we applied,
+        # so the delete targets the right object in the right namespace.
+        logger.debug("Deleting NetworkChaos experiment...")
+        output, return_code = await run_command_async(["kubectl", "delete", "-f", "-"], json.dumps(network_partition_spec))
         if return_code != 0:
-            logger.warning(f"Failed to delete NetworkChaos experiment: {output}. It may still be running, delete it manually!")
+            logger.warning("Failed to delete NetworkChaos experiment: %s. It may still be running, delete it manually!", output)
             return False
 
 
         return True
 
     except Exception as e:
-        logger.error(f"Exception occurred while killing pods: {e}")
+        logger.error("Exception occurred while killing pods: %s", e)
         return False
\ No newline at end of file
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 import logging
 import json
-from tests.utils import run_command, kubectl_installed, get_aks_credentials
+from tests.utils import run_command, ensure_cluster_ready
 
 logger = logging.getLogger(__name__)
 
@@ -21,34 +21,29 @@ def aks_kill_pods(resource_group: str, cluster_name: str, namespace_name: str, l
     """
 
     try:
-        if not get_aks_credentials(resource_group, cluster_name):
-            logger.error(f"Failed to get AKS credentials.")
-            return False
-        
-        if not kubectl_installed():
-            logger.error(f"kubectl is not installed or not configured properly.")
+        if not ensure_cluster_ready(resource_group, cluster_name):
             return False
 
         # Construct the kubectl command to delete pods by label
-        delete_pod_cmd = (
-            f"kubectl delete pod "
-            f"-l {label_selector} "
-            f"-n {namespace_name} "
-        )
+        delete_pod_cmd = [
+            "kubectl", "delete", "pod",
+            "-l", label_selector,
+            "-n", namespace_name,
+        ]
         if graceful_stop:
-            delete_pod_cmd += "--grace-period=30 "
+            delete_pod_cmd += ["--grace-period=30"]
         else:
-            delete_pod_cmd += "--grace-period=0 --force "
+            delete_pod_cmd += ["--grace-period=0", "--force"]
 
-        logger.debug(f"Executing command: {delete_pod_cmd}")
+        logger.debug("Executing command: %s", delete_pod_cmd)
         output, return_code = run_command(delete_pod_cmd)
         if return_code != 0:
-            logger.error(f"Failed to delete pods: {output}")
+            logger.error("Failed to delete pods: %s", output)
             return False
 
-        logger.info(f"Pods with label '{label_selector}' in namespace '{namespace_name}' deleted successfully.")
+        logger.info("Pods with label '%s' in namespace '%s' deleted successfully.", label_selector, namespace_name)
         return True
 
     except Exception as e:
-        logger.error(f"Exception occurred while killing pods: {e}")
+        logger.error("Exception occurred while killing pods: %s", e)
         return False
\ No newline at end of file
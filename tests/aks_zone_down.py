@@ -2,133 +2,160 @@
 
 import logging
 import json
-from tests.utils import run_command
+from tests.utils import run_command, get_shared_executor
 
 logger = logging.getLogger(__name__)
 
 
+def _process_nodepool(resource_group: str, cluster_name: str, node_rg: str, all_vmss_names: list[str], nodepool: dict, target_zone: str) -> bool:
+    """
+    Delete the VMSS instances of a single node pool that run in the target zone.
+
+    Args:
+        resource_group: Name of the resource group containing the AKS cluster
+        cluster_name: Name of the AKS cluster
+        node_rg: The node resource group holding the cluster's VMSS resources
+        all_vmss_names: Names of all VMSS in the node resource group
+        nodepool: Agent pool profile as returned by 'az aks show'
+        target_zone: Target availability zone (e.g., "1", "2", "3")
+
+    Returns:
+        True if successful (including nothing to delete), False otherwise
+    """
+    logger.debug("Processing node pool: %s", nodepool['name'])
+
+    # Find VMSS whose name contains the node pool name
+    vmss_names = [v for v in all_vmss_names if nodepool['name'] in v]
+
+    if not vmss_names:
+        logger.debug("No VMSS found for node pool '%s', skipping...", nodepool['name'])
+        return True
+
+    vmss_name = vmss_names[0]
+    logger.debug("Found VMSS '%s' for node pool '%s'", vmss_name, nodepool['name'])
+
+    # List VMSS instances in the target availability zone
+    list_instances_cmd = [
+        "az", "vmss", "list-instances",
+        "--resource-group", node_rg,
+        "--name", vmss_name,
+        "--query", f"[?zones[0]=='{target_zone}'].osProfile.computerName",
+        "-o", "json",
+    ]
+    instances_output, return_code = run_command(list_instances_cmd)
+
+    if return_code != 0:
+        logger.warning("Failed to list instances for VMSS '%s'", vmss_name)
+        return True
+
+    machine_names = json.loads(instances_output)
+
+    if not machine_names:
+        logger.warning("No instances found in zone %s for node pool '%s'.", target_zone, nodepool['name'])
+        return True
+
+    logger.debug("Deleting %s instance(s) in zone %s for node pool '%s' from cluster '%s'", len(machine_names), target_zone, nodepool['name'], cluster_name)
+
+    # Delete the machines
+    delete_machines_cmd = [
+        "az", "aks", "nodepool", "delete-machines",
+        "--resource-group", resource_group,
+        "--cluster-name", cluster_name,
+        "--nodepool-name", nodepool['name'],
+        "--machine-names", *machine_names,
+    ]
+    _, return_code = run_command(delete_machines_cmd)
+
+    if return_code != 0:
+        logger.error("Failed to delete machines in node pool '%s'", nodepool['name'])
+        return False
+
+    if nodepool['enableAutoScaling']:
+        logger.info("Machines were deleted from nodepool '%s' on cluster '%s'. Auto-scaling is enabled, so new nodes should be provisioned automatically within a few minutes.", nodepool['name'], cluster_name)
+    else:
+        logger.info("Machines were deleted from nodepool '%s' on cluster '%s'. Auto-scaling is disabled; consider manually scaling the node pool to restore capacity.", nodepool['name'], cluster_name)
+
+    return True
+
+
 def aks_zone_down(resource_group: str, cluster_name: str, target_zone: str) -> bool:
     """
     Simulate zone down by deleting all AKS nodes in a specific availability zone.
-    
+
     This function retrieves all node pools in the AKS cluster, finds VMSS instances
-    in the target zone, and deletes them to simulate zone failure.
-    
+    in the target zone, and deletes them to simulate zone failure. Node pools are
+    independent of each other, so their list/delete workflows run concurrently;
+    total latency is then that of the slowest pool instead of the sum of all pools.
+
     Args:
         resource_group: Name of the resource group containing the AKS cluster
         cluster_name: Name of the AKS cluster
         target_zone: Target availability zone (e.g., "1", "2", "3")
-        
+
     Returns:
         True if successful, False otherwise
     """
     try:
-        logger.info(f"Starting zone down simulation for cluster '{cluster_name}' in zone '{target_zone}'")
-        
-        # Retrieve the node resource group for the AKS cluster
-        show_cluster_cmd = (
-            f"az aks show "
-            f"--resource-group {resource_group} "
-            f"--name {cluster_name} "
-            f"--query nodeResourceGroup "
-            f"-o tsv"
-        )
-        node_rg, return_code = run_command(show_cluster_cmd)
-        logger.debug(f"Node resource group command output: {node_rg}")
+        logger.info("Starting zone down simulation for cluster '%s' in zone '%s'", cluster_name, target_zone)
+
+        # Retrieve the cluster once: the show output already contains both the
+        # node resource group and the agent pool profiles, so we don't need a
+        # separate 'az aks nodepool list' round-trip.
+        show_cluster_cmd = [
+            "az", "aks", "show",
+            "--resource-group", resource_group,
+            "--name", cluster_name,
+            "-o", "json",
+        ]
+        cluster_output, return_code = run_command(show_cluster_cmd)
+        logger.debug("Cluster show command output: %s", cluster_output)
 
         if return_code != 0:
-            logger.error(f"Failed to retrieve node resource group for cluster '{cluster_name}'")
+            logger.error("Failed to retrieve cluster '%s'", cluster_name)
             return False
-        
-        node_rg = node_rg.strip()
-        
-        # List all node pools in the AKS cluster
-        list_nodepools_cmd = (
-            f"az aks nodepool list "
-            f"--resource-group {resource_group} "
-            f"--cluster-name {cluster_name} "
-            f"-o json"
-        )
-        nodepools_output, return_code = run_command(list_nodepools_cmd)
-        logger.debug(f"Node pools command output: {nodepools_output}")
-        
+
+        cluster = json.loads(cluster_output)
+        node_rg = cluster["nodeResourceGroup"]
+        nodepools = cluster["agentPoolProfiles"]
+        logger.debug("Found %s node pool(s)", len(nodepools))
+
+        # List the VMSS in the node resource group once and match node pools
+        # against it client-side, instead of one filtered 'az vmss list' per pool.
+        # Projecting the zones too lets us skip the per-VMSS instance listing for
+        # scale sets that don't span the target zone at all.
+        list_vmss_cmd = [
+            "az", "vmss", "list",
+            "--resource-group", node_rg,
+            "--query", "[].{name: name, zones: zones}",
+            "-o", "json",
+        ]
+        vmss_output, return_code = run_command(list_vmss_cmd)
+
         if return_code != 0:
-            logger.error(f"Failed to list node pools for cluster '{cluster_name}'")
+            logger.error("Failed to list VMSS in node resource group '%s'", node_rg)
             return False
-        
-        # nodepools = [np.strip() for np in nodepools_output.strip().split('\n') if np.strip()]
-        nodepools = json.loads(nodepools_output)
-        logger.debug(f"Found {len(nodepools)} node pool(s)")
-        
-        # Process each node pool
-        for nodepool in nodepools:
-            logger.debug(f"Processing node pool: {nodepool['name']}")
-            
-            # Find VMSS whose name contains the node pool name
-            list_vmss_cmd = (
-                f"az vmss list "
-                f"--resource-group {node_rg} "
-                f"--query \"[?contains(name, '{nodepool['name']}')].name\" "
-                f"-o tsv"
-            )
-            vmss_output, return_code = run_command(list_vmss_cmd)
-            
-            if return_code != 0:
-                logger.warning(f"Failed to list VMSS for node pool '{nodepool['name']}'")
-                continue
-            
-            vmss_names = [v.strip() for v in vmss_output.strip().split('\n') if v.strip()]
-            
-            if not vmss_names:
-                logger.debug(f"No VMSS found for node pool '{nodepool['name']}', skipping...")
-                continue
-            
-            vmss_name = vmss_names[0]
-            logger.debug(f"Found VMSS '{vmss_name}' for node pool '{nodepool['name']}'")
-
-            # List VMSS instances in the target availability zone
-            list_instances_cmd = (
-                f"az vmss list-instances "
-                f"--resource-group {node_rg} "
-                f"--name {vmss_name} "
-                f"--query \"[?zones[0]=='{target_zone}'].osProfile.computerName\" "
-                f"-o tsv"
-            )
-            instances_output, return_code = run_command(list_instances_cmd)
-            
-            if return_code != 0:
-                logger.warning(f"Failed to list instances for VMSS '{vmss_name}'")
-                continue
-            
-            machine_names = [m.strip() for m in instances_output.strip().split('\n') if m.strip()]
-            
-            if machine_names:
-                logger.debug(f"Deleting {len(machine_names)} instance(s) in zone {target_zone} for node pool '{nodepool['name']}' from cluster '{cluster_name}'")
-                
-                # Delete the machines
-                delete_machines_cmd = (
-                    f"az aks nodepool delete-machines "
-                    f"--resource-group {resource_group} "
-                    f"--cluster-name {cluster_name} "
-                    f"--nodepool-name {nodepool['name']} "
-                    f"--machine-names {' '.join(machine_names)}"
-                )
-                _, return_code = run_command(delete_machines_cmd)
-                
-                if return_code != 0:
-                    logger.error(f"Failed to delete machines in node pool '{nodepool['name']}'")
-                    return False
-                
-                if nodepool['enableAutoScaling']:
-                    logger.info(f"Machines were deleted from nodepool '{nodepool['name']}' on cluster '{cluster_name}'. Auto-scaling is enabled, so new nodes should be provisioned automatically within a few minutes.")
-                else:
-                    logger.info(f"Machines were deleted from nodepool '{nodepool['name']}' on cluster '{cluster_name}'. Auto-scaling is disabled; consider manually scaling the node pool to restore capacity.")
-
-            else:
-                logger.warning(f"No instances found in zone {target_zone} for node pool '{nodepool['name']}'.")
 
+        all_vmss_names = [
+            vmss["name"] for vmss in json.loads(vmss_output)
+            if target_zone in (vmss["zones"] or [])
+        ]
+
+        # Process the node pools concurrently on the shared pool
+        results = list(get_shared_executor().map(
+            lambda nodepool: _process_nodepool(resource_group, cluster_name, node_rg, all_vmss_names, nodepool, target_zone),
+            nodepools
+        ))
+
+        # A zone down simulation is still meaningful if some pools lost their
+        # machines, so partial failure only warns; all pools failing aborts.
+        failures = results.count(False)
+        if failures == len(results) and failures > 0:
+            logger.error("Failed to delete machines in every node pool of cluster '%s'", cluster_name)
+            return False
+        if failures:
+            logger.warning("Failed to delete machines in %s of %s node pool(s) for cluster '%s'", failures, len(results), cluster_name)
         return True
-        
+
     except Exception as e:
-        logger.error(f"Error in aks_zone_down: {e}")
+        logger.error("Error in aks_zone_down: %s", e)
         return False
@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 
-import time
+import asyncio
+import json
 import logging
-from tests.utils import run_command
+from tests.utils import run_command_async
 
 logger = logging.getLogger(__name__)
 
-def block_network_access(resource_group: str, vnet: str, subnet_source: str, subnet_dest: str, duration_seconds: int) -> bool:
+async def block_network_access(resource_group: str, vnet: str, subnet_source: str, subnet_dest: str, duration_seconds: int) -> bool:
     """
     Block network connectivity between two subnets for a specified duration.
     
@@ -26,111 +27,144 @@ def block_network_access(resource_group: str, vnet: str, subnet_source: str, sub
     try:
         rule_name = f"block-{subnet_source}-to-{subnet_dest}-rule"
         
-        logger.info(f"Creating NSG rule to block traffic between {subnet_source} and {subnet_dest} for {duration_seconds} seconds")
+        logger.info("Creating NSG rule to block traffic between %s and %s for %s seconds", subnet_source, subnet_dest, duration_seconds)
         
-        # Get all NSGs associated with the source subnet:
-        get_nsg_cmd = f"az network vnet subnet show --resource-group {resource_group} --vnet-name {vnet} --name {subnet_source} --query \"networkSecurityGroup.id\" -o tsv"
-        nsg_id, return_code = run_command(get_nsg_cmd)
+        # Fetch the source subnet once: a single show already returns both the
+        # associated NSG and the address prefix, so we don't query it again below.
+        get_source_subnet_cmd = [
+            "az", "network", "vnet", "subnet", "show",
+            "--resource-group", resource_group,
+            "--vnet-name", vnet,
+            "--name", subnet_source,
+            "--query", "{nsgId: networkSecurityGroup.id, prefix: addressPrefix}",
+            "-o", "json",
+        ]
+        source_subnet_output, return_code = await run_command_async(get_source_subnet_cmd)
+
+        if return_code != 0:
+            logger.error("Failed to retrieve subnet %s in resource group %s", subnet_source, resource_group)
+            return False
+
+        source_subnet = json.loads(source_subnet_output)
+        nsg_id = source_subnet.get("nsgId") or ''
+        subnet_source_prefix = source_subnet.get("prefix") or ''
         nsg_name = nsg_id.strip().split('/')[-1] if nsg_id else ''
 
         we_created_nsg = False
 
         # If no NSG is associated, create one and associate it:
-        if return_code != 0 or not nsg_id.strip():
-            logger.info(f"Could not find existing NSG for subnet {subnet_source} in resource group {resource_group}. We'll have to create one.")
+        if not nsg_id.strip():
+            logger.info("Could not find existing NSG for subnet %s in resource group %s. We'll have to create one.", subnet_source, resource_group)
             nsg_name = f"{subnet_source}-chaostest-nsg"
-            create_nsg_cmd = f"az network nsg create --resource-group {resource_group} --name {nsg_name}"
-            _, return_code = run_command(create_nsg_cmd)            
+            create_nsg_cmd = ["az", "network", "nsg", "create", "--resource-group", resource_group, "--name", nsg_name]
+            _, return_code = await run_command_async(create_nsg_cmd)            
 
             if return_code != 0:
-                logger.error(f"Failed to create NSG for subnet {subnet_source} in resource group {resource_group}")
+                logger.error("Failed to create NSG for subnet %s in resource group %s", subnet_source, resource_group)
                 return False
             else:
                 we_created_nsg = True
             
             # Associate our new NSG with the subnet:
-            logger.debug(f"Associating newly created NSG with subnet {subnet_source} in resource group {resource_group}")
-            associate_nsg_cmd = f"az network vnet subnet update --resource-group {resource_group} --vnet-name {vnet} --name {subnet_source} --network-security-group {nsg_name}"
-            _, return_code = run_command(associate_nsg_cmd)
+            logger.debug("Associating newly created NSG with subnet %s in resource group %s", subnet_source, resource_group)
+            associate_nsg_cmd = [
+                "az", "network", "vnet", "subnet", "update",
+                "--resource-group", resource_group,
+                "--vnet-name", vnet,
+                "--name", subnet_source,
+                "--network-security-group", nsg_name,
+            ]
+            _, return_code = await run_command_async(associate_nsg_cmd)
 
             if return_code != 0:
-                logger.error(f"Failed to associate NSG with subnet {subnet_source} in resource group {resource_group}")
+                logger.error("Failed to associate NSG with subnet %s in resource group %s", subnet_source, resource_group)
                 return False
 
-        # Get address prefixes for both subnets
-        subnet_source_prefix, error_a = run_command(
-            f"az network vnet subnet show --resource-group {resource_group} --vnet-name {vnet} --name {subnet_source} --query \"addressPrefix\" -o tsv"
-        )
-        subnet_dest_prefix, error_b = run_command(
-            f"az network vnet subnet show --resource-group {resource_group} --vnet-name {vnet} --name {subnet_dest} --query \"addressPrefix\" -o tsv"
-        )
-        
-        if error_a != 0 or error_b != 0:
-            logger.error(f"Failed to retrieve address prefixes for subnets {subnet_source} or {subnet_dest}")
+        # We already have the source prefix; only the destination subnet needs a lookup
+        subnet_dest_prefix, return_code = await run_command_async([
+            "az", "network", "vnet", "subnet", "show",
+            "--resource-group", resource_group,
+            "--vnet-name", vnet,
+            "--name", subnet_dest,
+            "--query", "addressPrefix",
+            "-o", "tsv",
+        ])
+
+        if return_code != 0 or not subnet_source_prefix.strip():
+            logger.error("Failed to retrieve address prefixes for subnets %s or %s", subnet_source, subnet_dest)
             return False
         
-        logger.debug(f"Subnet {subnet_source} prefix: {subnet_source_prefix.strip()}, Subnet {subnet_dest} prefix: {subnet_dest_prefix.strip()}")
-        logger.debug(f"Adding temporary rule to NSG: {nsg_name}")
+        logger.debug("Subnet %s prefix: %s, Subnet %s prefix: %s", subnet_source, subnet_source_prefix.strip(), subnet_dest, subnet_dest_prefix.strip())
+        logger.debug("Adding temporary rule to NSG: %s", nsg_name)
         
         # Create NSG rule to deny traffic
-        create_rule_cmd = (
-            f"az network nsg rule create "
-            f"--resource-group {resource_group} "
-            f"--nsg-name {nsg_name} "
-            f"--name {rule_name} "
-            f"--priority 100 "
-            f"--direction Outbound "
-            f"--access Deny "
-            f"--protocol '*' "
-            f"--source-address-prefixes {subnet_source_prefix.strip()} "
-            f"--destination-address-prefixes {subnet_dest_prefix.strip()} "
-            f"--destination-port-ranges '*' "
-        )
+        create_rule_cmd = [
+            "az", "network", "nsg", "rule", "create",
+            "--resource-group", resource_group,
+            "--nsg-name", nsg_name,
+            "--name", rule_name,
+            "--priority", "100",
+            "--direction", "Outbound",
+            "--access", "Deny",
+            "--protocol", "*",
+            "--source-address-prefixes", subnet_source_prefix.strip(),
+            "--destination-address-prefixes", subnet_dest_prefix.strip(),
+            "--destination-port-ranges", "*",
+        ]
         
-        _, return_code = run_command(create_rule_cmd)
+        _, return_code = await run_command_async(create_rule_cmd)
         if return_code != 0:
-            logger.error(f"Failed to create NSG rule {rule_name}")
+            logger.error("Failed to create NSG rule %s", rule_name)
             return False
         
-        logger.debug(f"NSG rule created successfully: {rule_name}")
+        logger.debug("NSG rule created successfully: %s", rule_name)
         
         # Wait for specified duration
-        logger.info(f"Network blocked for {duration_seconds} seconds starting now...")
-        time.sleep(duration_seconds)
-        
-        # Remove the NSG rule
-        delete_rule_cmd = (
-            f"az network nsg rule delete "
-            f"--resource-group {resource_group} "
-            f"--nsg-name {nsg_name} "
-            f"--name {rule_name} "
-        )
-        
-        _, return_code = run_command(delete_rule_cmd)
-        if return_code != 0:
-            logger.error(f"Failed to delete NSG rule {rule_name}")
-            return False
+        logger.info("Network blocked for %s seconds starting now...", duration_seconds)
+        await asyncio.sleep(duration_seconds)
         
+        # Remove the NSG rule. If we created the NSG ourselves there is no point
+        # deleting the rule first — disassociating and deleting the NSG below
+        # takes the rule with it, which saves one ARM operation during cleanup.
+        if not we_created_nsg:
+            delete_rule_cmd = [
+                "az", "network", "nsg", "rule", "delete",
+                "--resource-group", resource_group,
+                "--nsg-name", nsg_name,
+                "--name", rule_name,
+            ]
+
+            _, return_code = await run_command_async(delete_rule_cmd)
+            if return_code != 0:
+                logger.error("Failed to delete NSG rule %s", rule_name)
+                return False
+
         # If we created the NSG, we should also remove it and disassociate it from the subnet
         if we_created_nsg:
-            logger.debug(f"Cleaning up: Deleting NSG {nsg_name} and disassociating it from subnet {subnet_source}")
+            logger.debug("Cleaning up: Deleting NSG %s and disassociating it from subnet %s", nsg_name, subnet_source)
             # Disassociate NSG
-            disassociate_nsg_cmd = f"az network vnet subnet update --resource-group {resource_group} --vnet-name {vnet} --name {subnet_source} --network-security-group null"
-            _, return_code = run_command(disassociate_nsg_cmd)
+            disassociate_nsg_cmd = [
+                "az", "network", "vnet", "subnet", "update",
+                "--resource-group", resource_group,
+                "--vnet-name", vnet,
+                "--name", subnet_source,
+                "--network-security-group", "null",
+            ]
+            _, return_code = await run_command_async(disassociate_nsg_cmd)
             if return_code != 0:
-                logger.error(f"Failed to disassociate NSG from subnet {subnet_source}")
+                logger.error("Failed to disassociate NSG from subnet %s", subnet_source)
                 return False
             
             # Delete NSG
-            delete_nsg_cmd = f"az network nsg delete --resource-group {resource_group} --name {nsg_name}"
-            _, return_code = run_command(delete_nsg_cmd)
+            delete_nsg_cmd = ["az", "network", "nsg", "delete", "--resource-group", resource_group, "--name", nsg_name]
+            _, return_code = await run_command_async(delete_nsg_cmd)
             if return_code != 0:
-                logger.error(f"Failed to delete NSG {nsg_name}")
+                logger.error("Failed to delete NSG %s", nsg_name)
                 return False
         
-        logger.debug(f"Network Blocking finished - NSG rule deleted successfully.")
+        logger.debug("Network Blocking finished - NSG rule deleted successfully.")
         return True
         
     except Exception as e:
-        logger.error(f"Error in block_network_access: {e}")
+        logger.error("Error in block_network_access: %s", e)
         return False
@@ -1,10 +1,61 @@
 #!/usr/bin/env python3
 import logging
 import json
-from tests.utils import run_command
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import cache
+from tests.utils import run_command, json_loads, get_shared_executor
 
 logger = logging.getLogger(__name__)
 
+# How long to wait for a failover to bring the server back to Ready
+_FAILOVER_TIMEOUT_SECONDS = 600
+
+# How many times a batch failover retries one database before giving up
+_MAX_FAILOVER_ATTEMPTS = 5
+
+# Command templates, built once at import. Each call only substitutes the
+# resource group / server name into the placeholders; the argv goes straight
+# to subprocess without a shell re-parsing it.
+# The one show template serves both the HA pre-check and the post-restart
+# polling: it projects exactly the three fields either of them reads.
+_SHOW_ARGS = [
+    "az", "postgres", "flexible-server", "show",
+    "--resource-group", "{rg}",
+    "--name", "{name}",
+    "--query", "{{ha: highAvailability.mode, zone: availabilityZone, state: state}}",
+    "-o", "json",
+]
+_RESTART_ARGS = [
+    "az", "postgres", "flexible-server", "restart",
+    "--resource-group", "{rg}",
+    "--name", "{name}",
+    "--failover", "{mode}",
+    "--no-wait",
+]
+
+
+def _format_args(template: list[str], **fields: str) -> tuple[str, ...]:
+    """Substitute fields into a command template, yielding an argv tuple."""
+    return tuple(arg.format(**fields) for arg in template)
+
+
+@cache
+def _show_argv(rg: str, name: str) -> tuple[str, ...]:
+    """Projected show argv for a server, formatted once per (rg, name) pair.
+
+    Retry loops call postgres_failover repeatedly for the same server; the
+    cache hands back the same tuple instead of re-formatting the template.
+    """
+    return _format_args(_SHOW_ARGS, rg=rg, name=name)
+
+
+@cache
+def _restart_argv(rg: str, name: str, mode: str) -> tuple[str, ...]:
+    """Restart argv for a server and failover mode, formatted once per combination."""
+    return _format_args(_RESTART_ARGS, rg=rg, name=name, mode=mode)
+
 def postgres_failover(resource_group: str, database_name: str, forced_failover: bool) -> bool:
     """
     Failover a highly available PostgreSQL database to the secondary node.
@@ -18,70 +69,136 @@ def postgres_failover(resource_group: str, database_name: str, forced_failover:
         True if successful, False otherwise
     """
     try:
-        logger.info(f"Starting PostgreSQL failover for database {database_name} in resource group {resource_group}. (Forced: {forced_failover})")
+        logger.info("Starting PostgreSQL failover for database %s in resource group %s. (Forced: %s)", database_name, resource_group, forced_failover)
         
         # Check if the database exists and get its HA configuration
-        get_db_cmd = (
-            f"az postgres flexible-server show "
-            f"--resource-group {resource_group} "
-            f"--name {database_name} "
-            f"-o json"
-        )
+        get_db_cmd = list(_show_argv(resource_group, database_name))
         db_output, return_code = run_command(get_db_cmd)
         
         if return_code != 0:
-            logger.error(f"Failed to retrieve database '{database_name}' in resource group '{resource_group}'")
+            logger.error("Failed to retrieve database '%s' in resource group '%s'", database_name, resource_group)
             return False
         
-        # Check if high availability is enabled
-        db_info = json.loads(db_output)
-        ha_enabled = db_info.get("highAvailability", {}).get("mode") == "ZoneRedundant"
-        current_zone = db_info.get("availabilityZone", {})
+        # Check if high availability is enabled. The show is projected down to
+        # the two fields we read, so the CLI ships tens of bytes instead of the
+        # full multi-KB server description.
+        db_info = json_loads(db_output)
+        ha_enabled = db_info["ha"] == "ZoneRedundant"
+        current_zone = db_info["zone"]
         
         if not ha_enabled:
-            logger.error(f"Database '{database_name}' is not configured for high availability")
+            logger.error("Database '%s' is not configured for high availability", database_name)
             return False
         else:
-            logger.info(f"Database '{database_name}' is HA enabled in zone {current_zone}")
+            logger.info("Database '%s' is HA enabled in zone %s", database_name, current_zone)
         
-        # Perform failover
-        if forced_failover:
-            failover_cmd = (
-                f"az postgres flexible-server restart "
-                f"--resource-group {resource_group} "
-                f"--name {database_name} "
-                f"--failover Forced"
-            )
-        else:
-            failover_cmd = (
-                f"az postgres flexible-server restart "
-                f"--resource-group {resource_group} "
-                f"--name {database_name} "
-                f"--failover Planned"
-            )
-        logger.debug(f"Executing failover command: {failover_cmd}")
+        # Kick off the failover without blocking: the CLI would otherwise sit on
+        # the full ARM long-running operation. We poll the server state instead.
+        failover_cmd = list(_restart_argv(resource_group, database_name, "Forced" if forced_failover else "Planned"))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Executing failover command: %s", failover_cmd)
         _, return_code = run_command(failover_cmd)
         
         if return_code != 0:
-            logger.error(f"Failed to failover database '{database_name}'")
+            logger.error("Failed to failover database '%s'", database_name)
             return False
-        
-        get_db_cmd = (
-            f"az postgres flexible-server show "
-            f"--resource-group {resource_group} "
-            f"--name {database_name} "
-            f"-o json"
-        )
-        db_output, return_code = run_command(get_db_cmd)
-        db_info = json.loads(db_output)
-        current_zone = db_info.get("availabilityZone", {})
 
-        logger.info(f"Database '{database_name}' failover completed successfully. It is now in zone {current_zone}")
+        # Poll with exponential backoff until the server reports Ready in a new
+        # zone, with an upper bound so a stuck operation can't hang the
+        # experiment. Ready alone isn't enough: the first poll fires a second
+        # after the --no-wait restart and can still see the stale pre-failover
+        # Ready, so we also require the zone to have flipped away from the one
+        # the pre-check captured. The final response doubles as the
+        # post-failover verification and no separate show is needed.
+        pre_failover_zone = current_zone
+        poll_state_cmd = list(_show_argv(resource_group, database_name))
+        deadline = time.monotonic() + _FAILOVER_TIMEOUT_SECONDS
+        attempt = 0
+        while True:
+            time.sleep(min(30, 2 ** attempt))
+            attempt += 1
+
+            poll_output, return_code = run_command(poll_state_cmd, use_cache=False)
+            server_state = json_loads(poll_output) if return_code == 0 else {}
+            logger.debug("Database '%s' state: %s", database_name, server_state)
+
+            if server_state.get("state") == "Ready" and server_state["zone"] != pre_failover_zone:
+                current_zone = server_state["zone"]
+                break
+
+            if time.monotonic() > deadline:
+                logger.error("Database '%s' did not return to Ready state within %s seconds", database_name, _FAILOVER_TIMEOUT_SECONDS)
+                return False
+
+        logger.info("Database '%s' failover completed successfully. It is now in zone %s", database_name, current_zone)
         return True
         
     except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse database configuration: {e}")
+        logger.error("Failed to parse database configuration: %s", e)
         return False
     except Exception as e:
-        logger.error(f"Error in postgres_failover: {e}")
-        return False
\ No newline at end of file
+        logger.error("Error in postgres_failover: %s", e)
+        return False
+
+
+def postgres_failover_async(resource_group: str, database_name: str, forced_failover: bool) -> Future:
+    """
+    Start a failover on the shared worker pool and return its Future.
+
+    The restart itself is already non-blocking (--no-wait plus polling), so a
+    caller that needs to fail over several databases can start them all and
+    wait on the futures together instead of serializing the poll windows.
+
+    Args:
+        resource_group: Name of the resource group containing the database
+        database_name: Name of the PostgreSQL database
+        forced_failover: If True, perform immediate failover; if False, perform planned failover
+
+    Returns:
+        A Future resolving to the boolean result of postgres_failover
+    """
+    return get_shared_executor().submit(postgres_failover, resource_group, database_name, forced_failover)
+
+
+def _failover_with_retry(resource_group: str, database_name: str, forced_failover: bool) -> bool:
+    """
+    Run postgres_failover with jittered exponential backoff between attempts.
+
+    ARM rate-limits bursty callers, and a batch of failovers is exactly such a
+    burst; the jitter spreads the retries of throttled databases apart so they
+    don't stampede the API again in lockstep.
+    """
+    for attempt in range(_MAX_FAILOVER_ATTEMPTS):
+        if postgres_failover(resource_group, database_name, forced_failover):
+            return True
+        if attempt + 1 < _MAX_FAILOVER_ATTEMPTS:
+            delay = random.uniform(1, 5) * 2 ** attempt
+            logger.warning("Failover of database '%s' failed (attempt %s of %s), retrying in %.1f seconds", database_name, attempt + 1, _MAX_FAILOVER_ATTEMPTS, delay)
+            time.sleep(delay)
+    return False
+
+
+def postgres_failover_many(targets: list[tuple[str, str, bool]], max_workers: int = 8) -> dict[tuple[str, str, bool], bool]:
+    """
+    Fail over many databases concurrently with bounded parallelism and retries.
+
+    Each target runs on its own worker, so a batch completes in roughly the
+    time of the slowest failover instead of the sum of all of them; the worker
+    cap keeps the batch from tripping ARM rate limits on top of the process-wide
+    az concurrency limit.
+
+    Args:
+        targets: (resource_group, database_name, forced_failover) per database
+        max_workers: Upper bound on concurrent failovers
+
+    Returns:
+        Mapping of each target tuple to its boolean result
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pg-failover") as executor:
+        futures = {executor.submit(_failover_with_retry, *target): target for target in targets}
+        results = {futures[future]: future.result() for future in as_completed(futures)}
+
+    failed = [target[1] for target, ok in results.items() if not ok]
+    if failed:
+        logger.error("Failover failed for %s of %s database(s): %s", len(failed), len(results), ", ".join(failed))
+    return results
\ No newline at end of file
@@ -1,36 +1,325 @@
 #!/usr/bin/env python3
 
+import asyncio
+import contextlib
+import os
+import shutil
 import subprocess
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
+
+# orjson parses the multi-KB JSON blobs the CLI emits a few times faster than
+# stdlib json. It stays optional: without it we fall back to the stdlib parser.
+# orjson's JSONDecodeError subclasses json.JSONDecodeError, so callers catching
+# the stdlib exception work with either parser.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 logger = logging.getLogger(__name__)
 
+# One worker pool shared by every experiment that fans out blocking CLI calls.
+# A single pool keeps the total number of in-flight Azure/kubectl subprocesses
+# bounded for the whole process instead of per caller.
+_shared_executor: ThreadPoolExecutor | None = None
+
 
-def run_command(command: str) -> tuple[str, int]:
+def get_shared_executor() -> ThreadPoolExecutor:
     """
-    Execute an Azure CLI command and return output and return code.
-    
+    Return the process-wide thread pool for blocking CLI work, creating it on first use.
+
+    Returns:
+        The shared ThreadPoolExecutor
+    """
+    global _shared_executor
+    if _shared_executor is None:
+        _shared_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="chaos")
+    return _shared_executor
+
+
+# ARM throttles bursty clients with 429s; allow at most 15 az invocations in
+# flight no matter how many experiments fan out at once. The thread-based and
+# asyncio entry points each get their own limit of the same size.
+_az_call_limit = threading.BoundedSemaphore(15)
+_az_async_call_limit = asyncio.Semaphore(15)
+
+# Environment for az children, built once. Disabling telemetry stops every az
+# command from forking a separate uploader process on exit.
+_az_env = {
+    **os.environ,
+    "AZURE_CORE_COLLECT_TELEMETRY": "0",
+    "AZURE_CORE_NO_COLOR": "1",
+}
+
+# Absolute paths of the helper binaries, resolved once. Substituting these for
+# argv[0] spares subprocess a PATH scan on every invocation; a binary missing
+# from PATH stays None and its commands run (and fail) as before.
+_BIN: dict[str, str | None] = {name: shutil.which(name) for name in ("az", "kubectl", "helm")}
+
+
+def _prewarm_az() -> None:
+    """Run az once in the background so its interpreter and ELF pages are warm
+    before the first real call."""
+    with contextlib.suppress(Exception):
+        subprocess.run([_BIN["az"], "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=_az_env)
+
+
+if _BIN["az"]:
+    threading.Thread(target=_prewarm_az, daemon=True).start()
+
+# Credential acquisitions that succeeded recently, keyed by (resource_group, cluster_name).
+# Fetching AKS credentials shells out to 'az aks get-credentials' and rewrites the
+# kubeconfig, so we skip it when several experiments target the same cluster.
+_aks_credentials_cache: dict[tuple[str, str], float] = {}
+_AKS_CREDENTIALS_TTL_SECONDS = 300
+
+# Successful results of recent read-only probe commands (show/version/status),
+# keyed by the full command. Re-running these forks a fresh CLI process for an
+# answer that rarely changes within a run. Mutating commands bypass this cache,
+# and a successful az mutation drops the cached shows of the resource it changed.
+_command_cache: dict[str, tuple[float, str, int]] = {}
+_command_cache_lock = threading.Lock()
+_COMMAND_CACHE_TTL_SECONDS = 60
+_CACHEABLE_SUBCOMMANDS = ("show", "version", "status")
+# az verbs that change a resource; a successful one drops cached show answers
+# for that resource so later probes see the mutation
+_MUTATING_SUBCOMMANDS = ("create", "update", "delete", "restart", "start", "stop")
+
+
+# Default subscription id, resolved once per process. Passing it explicitly to
+# every az command spares the CLI the per-call profile load and lookup.
+_subscription_id: str | None = None
+_subscription_lock = threading.Lock()
+
+
+def _get_subscription_id() -> str | None:
+    """
+    Resolve the default Azure subscription id once per process.
+
+    Returns:
+        The subscription id, or None if it could not be determined (e.g. not logged in)
+    """
+    global _subscription_id
+    with _subscription_lock:
+        if _subscription_id is None:
+            output, return_code = run_command(["az", "account", "show", "--query", "id", "-o", "tsv"])
+            _subscription_id = output.strip() if return_code == 0 else ""
+    return _subscription_id or None
+
+
+def _command_cache_key(command: str | list[str]) -> str:
+    return command if isinstance(command, str) else " ".join(command)
+
+
+def invalidate_command_cache(prefix: str) -> None:
+    """
+    Drop cached results for commands starting with the given prefix.
+
+    Callers that mutate a resource use this so the next probe of that resource
+    hits the live API instead of a stale cached answer.
+
     Args:
-        command: Azure CLI command to execute
-        
+        prefix: Command prefix to invalidate (e.g. "az postgres flexible-server show")
+    """
+    with _command_cache_lock:
+        for key in [k for k in _command_cache if k.startswith(prefix)]:
+            del _command_cache[key]
+
+
+def _flag_values(tokens: list[str]) -> dict[str, str]:
+    """Map each --flag in an argv to the value that follows it."""
+    return {
+        token: tokens[i + 1]
+        for i, token in enumerate(tokens[:-1])
+        if token.startswith("--") and not tokens[i + 1].startswith("--")
+    }
+
+
+def _invalidate_for_mutation(command: list[str]) -> None:
+    """
+    Drop cached show results for the resource an az mutation just changed.
+
+    A cached entry is dropped when it is the show of the mutated command group
+    and every flag it shares with the mutation names the same value. A subnet
+    update therefore invalidates that subnet's cached show, but not the cached
+    shows of other subnets or other resource types.
+
+    Args:
+        command: argv of the az command that just succeeded
+    """
+    for i, token in enumerate(command):
+        if token not in _MUTATING_SUBCOMMANDS:
+            continue
+        show_prefix = " ".join([*command[:i], "show"])
+        mutated_flags = _flag_values(command)
+        with _command_cache_lock:
+            for key in [k for k in _command_cache if k.startswith(show_prefix)]:
+                cached_flags = _flag_values(key.split())
+                if all(mutated_flags.get(flag, value) == value for flag, value in cached_flags.items()):
+                    del _command_cache[key]
+        return
+
+
+def run_command(command: str | list[str], stdin: str | None = None, use_cache: bool = True, capture: bool = True) -> tuple[str, int]:
+    """
+    Execute a CLI command and return output and return code.
+
+    Read-only probe commands (show/version/status) are cached for a minute so
+    repeated invocations within one run don't re-fork the CLI.
+
+    Args:
+        command: Command to execute. An argv list runs without a shell (no fork of
+            /bin/sh, no quoting concerns); a string goes through the shell for
+            compound commands that need pipes or && chaining.
+        stdin: Optional input to pass to the command's stdin
+        use_cache: Set to False for probes that must observe live state, e.g.
+            when polling a long-running operation
+        capture: Set to False when only the return code matters; the child's
+            output then goes to /dev/null instead of being buffered and decoded
+
     Returns:
-        Tuple of (output, return_code)
+        Tuple of (output, return_code); output is empty when capture is False
     """
+    cache_key = _command_cache_key(command)
+    cacheable = use_cache and capture and stdin is None and any(sub in cache_key.split() for sub in _CACHEABLE_SUBCOMMANDS)
+    if cacheable:
+        with _command_cache_lock:
+            cached = _command_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < _COMMAND_CACHE_TTL_SECONDS:
+                logger.debug("Using cached result for command: %s", cache_key)
+                return cached[1], cached[2]
+
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True
+        use_shell = isinstance(command, str)
+        is_az = command.lstrip().startswith("az ") if use_shell else command[0] == "az"
+        # Keep the caller's argv around: cache keys are built from it, and the
+        # rebindings below (subscription pinning, absolute binary path) would
+        # otherwise make mutation-driven invalidation miss them.
+        caller_argv = None if use_shell or not is_az else command
+
+        # Pin az commands to the resolved subscription so the CLI skips its own
+        # default-subscription lookup. 'az account show' is what resolves it, so
+        # it is excluded to avoid recursing.
+        if is_az and not use_shell and "--subscription" not in command and command[1:3] != ["account", "show"]:
+            subscription_id = _get_subscription_id()
+            if subscription_id:
+                command = command + ["--subscription", subscription_id]
+
+        if not use_shell and _BIN.get(command[0]):
+            command = [_BIN[command[0]], *command[1:]]
+
+        limit = _az_call_limit if is_az else contextlib.nullcontext()
+        io_kwargs = (
+            {"capture_output": True}
+            if capture
+            else {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
         )
+        with limit:
+            result = subprocess.run(
+                command,
+                shell=use_shell,
+                input=stdin,
+                text=True,
+                env=_az_env if is_az else None,
+                **io_kwargs
+            )
         if result.returncode != 0:
-            logger.debug(f"Azure CLI command failed: {result.stderr}")
+            logger.debug("Azure CLI command failed: %s", result.stderr)
+        elif cacheable:
+            # Only successes go in the cache so transient failures get retried
+            with _command_cache_lock:
+                _command_cache[cache_key] = (time.monotonic(), result.stdout, result.returncode)
+        elif caller_argv is not None:
+            _invalidate_for_mutation(caller_argv)
 
-        return result.stdout, result.returncode
+        return result.stdout or "", result.returncode
     except Exception as e:
-        logger.error(f"Error executing Azure CLI command: {e}")
+        logger.error("Error executing Azure CLI command: %s", e)
         return "", 1
-    
+
+
+async def run_command_async(command: str | list[str], stdin: str | None = None, use_cache: bool = True, capture: bool = True) -> tuple[str, int]:
+    """
+    Asyncio counterpart of run_command for callers already running in an event loop.
+
+    The child process is awaited directly on the loop instead of tying up a
+    worker thread for the duration of the call, so an async experiment can have
+    many commands in flight without thread-pool overhead. Caching, subscription
+    pinning, and the az concurrency limit behave exactly as in run_command.
+
+    Args:
+        command: Command to execute; argv lists run without a shell, strings through one
+        stdin: Optional input to pass to the command's stdin
+        use_cache: Set to False for probes that must observe live state
+        capture: Set to False when only the return code matters
+
+    Returns:
+        Tuple of (output, return_code); output is empty when capture is False
+    """
+    cache_key = _command_cache_key(command)
+    cacheable = use_cache and capture and stdin is None and any(sub in cache_key.split() for sub in _CACHEABLE_SUBCOMMANDS)
+    if cacheable:
+        with _command_cache_lock:
+            cached = _command_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < _COMMAND_CACHE_TTL_SECONDS:
+                logger.debug("Using cached result for command: %s", cache_key)
+                return cached[1], cached[2]
+
+    try:
+        use_shell = isinstance(command, str)
+        is_az = command.lstrip().startswith("az ") if use_shell else command[0] == "az"
+        caller_argv = None if use_shell or not is_az else command
+
+        if is_az and not use_shell and "--subscription" not in command and command[1:3] != ["account", "show"]:
+            # _get_subscription_id blocks on the CLI the first time, so keep it
+            # off the loop; afterwards it's a cached read.
+            subscription_id = await asyncio.to_thread(_get_subscription_id)
+            if subscription_id:
+                command = command + ["--subscription", subscription_id]
+
+        if not use_shell and _BIN.get(command[0]):
+            command = [_BIN[command[0]], *command[1:]]
+
+        limit = _az_async_call_limit if is_az else contextlib.nullcontext()
+        stream = asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL
+        async with limit:
+            if use_shell:
+                process = await asyncio.create_subprocess_shell(
+                    command,
+                    stdin=asyncio.subprocess.PIPE if stdin is not None else None,
+                    stdout=stream,
+                    stderr=stream,
+                    env=_az_env if is_az else None,
+                )
+            else:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdin=asyncio.subprocess.PIPE if stdin is not None else None,
+                    stdout=stream,
+                    stderr=stream,
+                    env=_az_env if is_az else None,
+                )
+            stdout, stderr = await process.communicate(stdin.encode() if stdin is not None else None)
+
+        output = stdout.decode() if stdout else ""
+        if process.returncode != 0:
+            logger.debug("Azure CLI command failed: %s", stderr.decode() if stderr else "")
+        elif cacheable:
+            with _command_cache_lock:
+                _command_cache[cache_key] = (time.monotonic(), output, process.returncode)
+        elif caller_argv is not None:
+            _invalidate_for_mutation(caller_argv)
+
+        return output, process.returncode
+    except Exception as e:
+        logger.error("Error executing Azure CLI command: %s", e)
+        return "", 1
+
+
 def get_aks_credentials(resource_group: str, cluster_name: str) -> bool:
     """
     Get AKS cluster credentials using Azure CLI, or use existing kubectl context if available.
@@ -42,66 +331,105 @@ def get_aks_credentials(resource_group: str, cluster_name: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
+    # If we already obtained working credentials for this cluster recently, don't
+    # pay for another az round-trip or context verification.
+    last_success = _aks_credentials_cache.get((resource_group, cluster_name))
+    if last_success is not None and time.monotonic() - last_success < _AKS_CREDENTIALS_TTL_SECONDS:
+        logger.debug("Using cached AKS credentials for cluster '%s'", cluster_name)
+        return True
+
     # Check if there's an existing kubectl context
-    check_context_cmd = "kubectl config current-context"
+    check_context_cmd = ["kubectl", "config", "current-context"]
     output, return_code = run_command(check_context_cmd)
     
     if return_code == 0 and output.strip():
         current_context = output.strip()
-        logger.debug(f"Trying existing kubectl context: {current_context}")
+        logger.debug("Trying existing kubectl context: %s", current_context)
         
         # Verify the context is accessible by checking cluster connectivity
-        verify_cmd = "kubectl cluster-info"
-        verify_output, verify_return_code = run_command(verify_cmd)
+        verify_cmd = ["kubectl", "cluster-info"]
+        _, verify_return_code = run_command(verify_cmd, capture=False)
         if verify_return_code == 0:
-            logger.debug(f"Successfully connected to cluster using existing context '{current_context}'")
+            logger.debug("Successfully connected to cluster using existing context '%s'", current_context)
+            _aks_credentials_cache[(resource_group, cluster_name)] = time.monotonic()
             return True
         else:
-            logger.debug(f"Existing context '{current_context}' is not accessible, we can't use it")
+            logger.debug("Existing context '%s' is not accessible, we can't use it", current_context)
     
     # No valid context exists, get new credentials from Azure
-    logger.debug(f"No valid kubectl context found, fetching AKS credentials for cluster '{cluster_name}'")
-
-    get_credentials_cmd = (
-        f"az aks get-credentials "
-        f"--resource-group {resource_group} "
-        f"--name {cluster_name} "
-        f"--overwrite-existing"
-    )
+    logger.debug("No valid kubectl context found, fetching AKS credentials for cluster '%s'", cluster_name)
+
+    get_credentials_cmd = [
+        "az", "aks", "get-credentials",
+        "--resource-group", resource_group,
+        "--name", cluster_name,
+        "--overwrite-existing",
+    ]
     output, return_code = run_command(get_credentials_cmd)
     if return_code != 0:
-        logger.error(f"Failed to get AKS credentials: {output}")
+        logger.error("Failed to get AKS credentials: %s", output)
         return False
     
-    logger.debug(f"AKS credentials obtained successfully for cluster '{cluster_name}' in resource group '{resource_group}'")
+    logger.debug("AKS credentials obtained successfully for cluster '%s' in resource group '%s'", cluster_name, resource_group)
+    _aks_credentials_cache[(resource_group, cluster_name)] = time.monotonic()
     return True
 
+@lru_cache(maxsize=None)
+def ensure_cluster_ready(resource_group: str, cluster_name: str) -> bool:
+    """
+    Check the shared AKS prerequisites (kubectl present, credentials obtained) once per cluster.
+
+    Every AKS experiment needs the same probes on entry; caching the outcome means
+    a run with several experiments against one cluster pays for them only once.
+
+    Args:
+        resource_group: The resource group of the AKS cluster
+        cluster_name: The name of the AKS cluster
+
+    Returns:
+        True if the cluster is ready to use, False otherwise
+    """
+    if not kubectl_installed():
+        logger.error("kubectl is not installed or not configured properly.")
+        return False
+
+    if not get_aks_credentials(resource_group, cluster_name):
+        logger.error("Failed to get AKS credentials for cluster '%s'.", cluster_name)
+        return False
+
+    return True
+
+@cache
 def kubectl_installed() -> bool:
     """
     Check if kubectl is installed and accessible.
-    
+
+    A PATH lookup answers this without forking the binary; PATH doesn't change
+    mid-run, so the answer is cached for the life of the process.
+
     Returns:
         True if kubectl is installed, False otherwise
     """
-    kubectl_check_cmd = "kubectl version --client"
-    output, return_code = run_command(kubectl_check_cmd)
-    return return_code == 0
+    return shutil.which("kubectl") is not None
 
+@cache
 def helm_installed() -> bool:
     """
     Check if Helm is installed and accessible.
-    
+
     Returns:
         True if Helm is installed, False otherwise
     """
-    helm_check_cmd = "helm version"
-    output, return_code = run_command(helm_check_cmd)
-    return return_code == 0
+    return shutil.which("helm") is not None
 
+@lru_cache(maxsize=1)
 def chaos_mesh_installed() -> bool:
     """
     Check if Chaos Mesh is installed in the Kubernetes cluster.
-    
+
+    The probe shells out to helm, so the answer is cached for the life of the
+    process; install_chaos_mesh invalidates it after installing.
+
     Returns:
         True if Chaos Mesh is installed, False otherwise
     """
@@ -109,8 +437,8 @@ def chaos_mesh_installed() -> bool:
     if not helm_installed():
         return False
 
-    check_cmd = "helm status chaos-mesh -n chaos-testing"
-    output, return_code = run_command(check_cmd)
+    check_cmd = ["helm", "status", "chaos-mesh", "-n", "chaos-testing"]
+    _, return_code = run_command(check_cmd, capture=False)
     return return_code == 0
 
 def install_chaos_mesh() -> bool:
@@ -121,21 +449,25 @@ def install_chaos_mesh() -> bool:
         True if installation was successful, False otherwise
     """
 
-    install_chaos_mesh_cmds = [
-        "helm repo add chaos-mesh https://charts.chaos-mesh.org && helm repo update",
-        "kubectl get ns chaos-testing || kubectl create ns chaos-testing",
-        (
-            "helm install chaos-mesh chaos-mesh/chaos-mesh "
-            "--namespace=chaos-testing "
-            "--set chaosDaemon.runtime=containerd "
-            "--set chaosDaemon.socketPath=/run/containerd/containerd.sock"
-        )
+    # One helm invocation does the whole bootstrap: --repo fetches the chart
+    # straight from its URL (no prior 'helm repo add/update'), and
+    # --create-namespace replaces the kubectl get/create namespace dance.
+    # That's one fork instead of the four shell-composed ones this used to run.
+    install_cmd = [
+        "helm", "upgrade", "--install", "chaos-mesh", "chaos-mesh",
+        "--repo", "https://charts.chaos-mesh.org",
+        "--namespace", "chaos-testing",
+        "--create-namespace",
+        "--set", "chaosDaemon.runtime=containerd",
+        "--set", "chaosDaemon.socketPath=/run/containerd/containerd.sock",
     ]
+    output, return_code = run_command(install_cmd)
+    if return_code != 0:
+        logger.error("Failed to execute command '%s': %s", install_cmd, output)
+        return False
 
-    for cmd in install_chaos_mesh_cmds:
-        output, return_code = run_command(cmd)
-        if return_code != 0:
-            logger.error(f"Failed to execute command '{cmd}': {output}")
-            return False
-        
-    logger.debug("Chaos Mesh installed successfully.")
\ No newline at end of file
+    # The cached probe answered False before this install; forget that answer
+    chaos_mesh_installed.cache_clear()
+
+    logger.debug("Chaos Mesh installed successfully.")
+    return True
\ No newline at end of file